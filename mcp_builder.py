@@ -7,15 +7,61 @@ Genera server MCP (Model Context Protocol) di alta qualità con best practices i
 
 import argparse
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Union
 from enum import Enum
+import hashlib
 import json
+import keyword
+import re
 import subprocess
 import sys
+import threading
 from pydantic import BaseModel, Field, ConfigDict
+from pydantic.json_schema import models_json_schema
 from mcp.server.fastmcp import FastMCP
 
+# File generati accanto al server
+LAUNCHER_FILE = "serve.py"  # Launcher multi-worker generato per i trasporti HTTP/SSE
+BENCHMARK_FILE = "bench_validation.py"  # Benchmark del costo di validazione per tool
+FASTMCP_TRANSPORTS = {"stdio": "stdio", "sse": "sse", "http": "streamable-http"}  # Transport -> mcp.run()
+EVALUATION_TOOL_LIMIT = 10  # Le spec grandi generano una evaluation solo sui primi tool
+# Tool(outputSchema), risultati strutturati e transport_security arrivano con 1.10; 2.x rimuove FastMCP
+MCP_REQUIREMENT = "mcp[cli]>=1.10.0,<2"
+
+# Conversione OpenAPI
+OPENAPI_CACHE_VERSION = 6
+DEEP_RECURSION_LIMIT = 200000  # Limite per gli schemi di grafi $ref profondi (pydantic li visita ricorsivamente)
+DEEP_STACK_SIZE = 512 * 1024 * 1024  # Stack del thread che li calcola, perché il limite non esaurisca lo stack C
+MODEL_MARKER = re.compile("\0(\\w+)\0")  # Segnaposto dei modelli nelle annotazioni in costruzione
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+SCALAR_TYPES = {"string": "str", "integer": "int", "number": "float", "boolean": "bool"}
+# Nomi usati nelle annotazioni dei modelli generati: un campo con lo stesso nome li oscurerebbe
+RESERVED_FIELD_NAMES = {
+    "str", "int", "float", "bool", "Any", "List", "Dict", "Optional", "Literal", "Union",
+    "Field", "BaseModel", "ConfigDict",
+}
+SCHEMA_CONSTRAINTS = {
+    "minLength": "min_length", "maxLength": "max_length",
+    "minItems": "min_length", "maxItems": "max_length",
+    "minimum": "ge", "maximum": "le",
+}
+# Hint MCP per metodo HTTP: (readOnly, destructive, idempotent)
+METHOD_HINTS = {
+    "GET": (True, False, True), "HEAD": (True, False, True), "OPTIONS": (True, False, True),
+    "TRACE": (True, False, True), "PUT": (False, True, True), "DELETE": (False, True, True),
+    "PATCH": (False, True, False), "POST": (False, False, False),
+}
+
+# Campioni di input del benchmark di validazione
+MISSING = object()  # Esempio non costruibile (riferimento ciclico o troppo profondo)
+SCHEMA_EXAMPLE_DEPTH = 8  # Modelli annidati al massimo in un campione del benchmark
+SCHEMA_EXAMPLE_FORMATS = {
+    "date": "2024-01-01", "date-time": "2024-01-01T00:00:00Z", "time": "00:00:00",
+    "uuid": "00000000-0000-0000-0000-000000000000", "email": "user@example.com",
+    "uri": "https://example.com", "ipv4": "127.0.0.1", "ipv6": "::1",
+}
+
 class Language(Enum):
     PYTHON = "python"
     TYPESCRIPT = "typescript"
@@ -25,16 +71,632 @@ class Transport(Enum):
     SSE = "sse"
     HTTP = "http"
 
+class Layout(Enum):
+    SINGLE = "single"
+    LAZY = "lazy"
+
 @dataclass
 class MCPConfig:
     service_name: str
     language: Language
     transport: Transport
     generate_evaluation: bool
+    layout: Layout = Layout.SINGLE
+    openapi: Optional[Path] = None
+    hedge_percentile: Optional[float] = None
+
+@dataclass
+class ToolField:
+    """Campo di input di un tool, generato come Field Pydantic."""
+    name: str
+    annotation: str
+    description: str
+    required: bool = True
+    default: Any = None
+    constraints: Dict[str, Any] = field(default_factory=dict)
+    alias: Optional[str] = None
+    location: str = "query"
+    media_type: Optional[str] = None  # Parametri con content e body: media type della spec
+
+@dataclass
+class ToolSpec:
+    """Descrizione di un tool generato, indipendente dal layout del server."""
+    name: str
+    summary: str
+    endpoint: str
+    fields: List[ToolField]
+    read_only: bool = True
+    destructive: bool = False
+    idempotent: bool = True
+    open_world: bool = True
+    method: Optional[str] = None
+    models: List[str] = field(default_factory=list)
+
+@dataclass
+class ModelModule:
+    """Modulo di modelli generato: un modello, o tutti i modelli di un ciclo di $ref."""
+    name: str
+    classes: List[str]
+    source: str
+    imports: List[str] = field(default_factory=list)  # Classi di altri moduli usate qui
+    rebuilds: List[str] = field(default_factory=list)  # Classi del ciclo, costruite a fine modulo
+
+def _py_literal(value: Any) -> str:
+    """Rende un valore come letterale Python, con le stringhe tra doppi apici."""
+    if isinstance(value, str):
+        return json.dumps(value)
+    return repr(value)
+
+def _render_field(tool_field: ToolField) -> str:
+    """Genera la riga di dichiarazione di un campo Pydantic."""
+    args = []
+    if not tool_field.required:
+        args.append(f"default={_py_literal(tool_field.default)}")
+    if tool_field.alias:
+        args.append(f"alias={_py_literal(tool_field.alias)}")
+    args.append(f"description={_py_literal(tool_field.description)}")
+    args.extend(f"{key}={_py_literal(value)}" for key, value in tool_field.constraints.items())
+    return f"    {tool_field.name}: {tool_field.annotation} = Field({', '.join(args)})"
+
+def _schema_example(schema: Any, definitions: Dict[str, Any], seen: tuple = ()) -> Any:
+    """Costruisce un valore d'esempio valido per uno schema JSON (campioni del benchmark).
+
+    Restituisce MISSING per i riferimenti ciclici o oltre SCHEMA_EXAMPLE_DEPTH modelli
+    annidati, che il chiamante omette se opzionali.
+    """
+    if not isinstance(schema, dict):
+        return None
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        if name in seen or name not in definitions or len(seen) > SCHEMA_EXAMPLE_DEPTH:
+            return MISSING
+        return _schema_example(definitions[name], definitions, seen + (name,))
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        options = [option for option in schema.get(key, []) if option.get("type") != "null"]
+        for option in options:
+            value = _schema_example(option, definitions, seen)
+            if value is not MISSING:
+                return value
+        if key in schema:
+            return None
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        example = {}
+        required = set(schema.get("required", []))
+        for name, property_schema in schema.get("properties", {}).items():
+            value = _schema_example(property_schema, definitions, seen)
+            if value is MISSING:
+                if name in required:
+                    return MISSING
+                continue
+            example[name] = value
+        return example
+    if schema_type == "array":
+        item = _schema_example(schema.get("items", {}), definitions, seen)
+        if item is MISSING:
+            return []
+        return [item] * schema.get("minItems", 1)
+    if schema_type == "string":
+        return SCHEMA_EXAMPLE_FORMATS.get(schema.get("format"), "x" * max(schema.get("minLength", 1), 1))
+    if schema_type in ("integer", "number"):
+        value = schema.get("minimum", schema.get("exclusiveMinimum", 0) + 1 if "exclusiveMinimum" in schema else 1)
+        value = min(value, schema.get("maximum", value))
+        return int(value) if schema_type == "integer" else float(value)
+    if schema_type == "boolean":
+        return True
+    return None
+
+
+def _snake_case(text: str) -> str:
+    """Converte un identificatore qualsiasi (camelCase, kebab-case, path) in snake_case."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", text)
+    return re.sub(r"[^0-9a-zA-Z]+", "_", text).strip("_").lower()
+
+def _plain_text(text: Any, fallback: str) -> str:
+    """Riduce una descrizione della spec a una riga sicura dentro docstring e stringhe."""
+    text = " ".join(str(text or "").split()).replace("\\", "/").replace('"', "'")
+    return text or fallback
+
+def _parse_spec(raw: bytes, suffix: str) -> dict:
+    """Interpreta una spec OpenAPI in formato JSON o YAML."""
+    if suffix.lower() in (".yaml", ".yml"):
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        return yaml.load(raw, Loader=loader)
+    return json.loads(raw)
+
+def _run_deep(function, *args) -> Any:
+    """Esegue function in un thread con stack grande e limite di ricorsione alzato.
+
+    Serve per le visite ricorsive (modelli e schemi JSON di pydantic, campioni del
+    benchmark) su grafi di $ref troppo profondi per il limite di default.
+    """
+    outcome: Dict[str, Any] = {}
+
+    def target():
+        try:
+            outcome["result"] = function(*args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    recursion_limit = sys.getrecursionlimit()
+    stack_size = threading.stack_size(DEEP_STACK_SIZE)
+    sys.setrecursionlimit(max(recursion_limit, DEEP_RECURSION_LIMIT))
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+        threading.stack_size(stack_size)
+    if isinstance(outcome.get("error"), RecursionError):
+        raise ValueError("OpenAPI $ref graph is too deep to compute the tool schemas")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+@dataclass
+class OpenAPIIndex:
+    """Indice di una spec OpenAPI: base URL, tool e modelli pronti per la generazione.
+
+    L'indice è salvato in cache su disco, indicizzato dall'hash della spec:
+    rigenerare da una spec invariata non richiede né parsing né risoluzione dei $ref.
+    """
+    base_url: str
+    tools: List[ToolSpec]
+    models: List[ModelModule]
+    schemas: Dict[str, dict] = field(default_factory=dict)
+    cache_file: Optional[Path] = None
+
+    @classmethod
+    def load(cls, spec_path: Path, service_name: str, cache_dir: Path) -> "OpenAPIIndex":
+        """Carica l'indice dalla cache o, se assente, lo costruisce dalla spec."""
+        raw = spec_path.read_bytes()
+        key = hashlib.sha256(raw + f"\0{service_name}\0{OPENAPI_CACHE_VERSION}".encode()).hexdigest()
+        cache_file = cache_dir / f"openapi-{key[:32]}.json"
+        if cache_file.exists():
+            try:
+                return cls.from_dict(json.loads(cache_file.read_text(encoding="utf-8")), cache_file)
+            except (ValueError, KeyError, TypeError):
+                print(f"[WARNING] Ignoring unreadable OpenAPI cache: {cache_file}")
+
+        spec = _parse_spec(raw, spec_path.suffix)
+        index = OpenAPIConverter(spec, service_name).convert()
+        index.cache_file = cache_file
+        index.save()
+        return index
+
+    @classmethod
+    def from_dict(cls, data: dict, cache_file: Optional[Path] = None) -> "OpenAPIIndex":
+        """Ricostruisce l'indice dal contenuto del file di cache."""
+        tools = [
+            ToolSpec(**{**tool, "fields": [ToolField(**tool_field) for tool_field in tool["fields"]]})
+            for tool in data["tools"]
+        ]
+        models = [ModelModule(**module) for module in data["models"]]
+        return cls(data["base_url"], tools, models, data["schemas"], cache_file)
+
+    def save(self):
+        """Scrive l'indice nel file di cache."""
+        if self.cache_file is None:
+            return
+        data = {
+            "base_url": self.base_url,
+            "tools": [asdict(tool) for tool in self.tools],
+            "models": [asdict(module) for module in self.models],
+            "schemas": self.schemas,
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_file.write_text(json.dumps(data), encoding="utf-8")
+
+class OpenAPIConverter:
+    """Converte una spec OpenAPI 3 in tool e modelli Pydantic.
+
+    I $ref sono risolti una sola volta e memoizzati, così il costo resta lineare
+    anche con migliaia di operazioni; i modelli referenziati sono raccolti con una
+    worklist, senza ricorsione sui $ref. Vengono generati solo i modelli
+    raggiungibili dagli input delle operazioni.
+    """
+
+    def __init__(self, spec: dict, service_name: str):
+        if not isinstance(spec, dict) or not str(spec.get("openapi", "")).startswith("3"):
+            raise ValueError("Unsupported spec: only OpenAPI 3.x documents are supported")
+        self.spec = spec
+        self.service_name = service_name
+        self.models: List[ModelModule] = []
+        self._module_names: set = set()
+        self._resolved: Dict[str, Any] = {}
+        self._ref_annotations: Dict[str, str] = {}
+        self._class_names: set = set()
+        self._model_order: List[str] = []
+        self._model_schemas: Dict[str, dict] = {}
+        self._model_fields: Dict[str, List[ToolField]] = {}
+
+    def convert(self) -> OpenAPIIndex:
+        """Costruisce l'indice completo della spec."""
+        tools = []
+        tool_names: set = set()
+        for path, path_item in (self.spec.get("paths") or {}).items():
+            path_item = self.resolve(path_item)
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if isinstance(operation, dict):
+                    tools.append(self._operation_tool(path, method, operation, path_item, tool_names))
+
+        # Worklist invece di ricorsione: la profondità del grafo dei $ref non conta
+        position = 0
+        while position < len(self._model_order):
+            name = self._model_order[position]
+            self._model_fields[name] = self._schema_fields(self._model_schemas[name], name)
+            position += 1
+        self._emit_models()
+
+        for tool in tools:
+            tool.models = sorted(set(MODEL_MARKER.findall(" ".join(f.annotation for f in tool.fields))))
+            for tool_field in tool.fields:
+                tool_field.annotation = MODEL_MARKER.sub(r"\1", tool_field.annotation)
+        return OpenAPIIndex(self._base_url(), tools, self.models)
+
+    def resolve(self, node: Any) -> Any:
+        """Segue una catena di $ref locali, memoizzando ogni puntatore."""
+        seen = set()
+        while isinstance(node, dict) and "$ref" in node:
+            ref = node["$ref"]
+            if ref in seen:
+                return {}
+            seen.add(ref)
+            if ref not in self._resolved:
+                self._resolved[ref] = self._lookup(ref)
+            node = self._resolved[ref]
+        return node if isinstance(node, dict) else {}
+
+    def _lookup(self, ref: str) -> Any:
+        """Risolve un JSON pointer locale; i riferimenti esterni non sono supportati."""
+        if not ref.startswith("#/"):
+            print(f"[WARNING] External $ref not supported, treated as Any: {ref}")
+            return {}
+        node: Any = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if not isinstance(node, dict) or part not in node:
+                print(f"[WARNING] Unresolvable $ref, treated as Any: {ref}")
+                return {}
+            node = node[part]
+        return node
+
+    def _base_url(self) -> str:
+        """Base URL dal primo server della spec, con le variabili ai valori di default.
+
+        Un URL relativo (es. "/api/v3") resta relativo: l'host va configurato nel server generato.
+        """
+        servers = self.spec.get("servers") or [{}]
+        url = servers[0].get("url", "")
+        for name, variable in (servers[0].get("variables") or {}).items():
+            url = url.replace(f"{{{name}}}", str(variable.get("default", "")))
+        if url.startswith("//"):
+            url = f"https:{url}"
+        if not url.startswith(("http://", "https://")):
+            url = "/" + url.lstrip("/")
+        return url.rstrip("/")
+
+    def _class_name(self, raw: str) -> str:
+        """Nome di classe univoco per un modello generato."""
+        base = "".join(part[:1].upper() + part[1:] for part in re.split(r"[^0-9a-zA-Z]+", raw) if part)
+        if not base or base[0].isdigit():
+            base = f"M{base}"
+        name = f"{base}Model"
+        suffix = 2
+        while name in self._class_names or name == "BaseModel":
+            name = f"{base}{suffix}Model"
+            suffix += 1
+        self._class_names.add(name)
+        return name
+
+    def _field_name(self, raw: str, taken: set) -> str:
+        """Nome di campo Python valido e univoco per una proprietà della spec."""
+        name = _snake_case(raw) or "field"
+        if (name[0].isdigit() or keyword.iskeyword(name) or name.startswith("model_")
+                or name in RESERVED_FIELD_NAMES or name in self._class_names):
+            name = f"field_{name}"
+        elif hasattr(BaseModel, name):
+            name = f"{name}_"
+        unique = name
+        suffix = 2
+        while unique in taken:
+            unique = f"{name}_{suffix}"
+            suffix += 1
+        taken.add(unique)
+        return unique
+
+    def _merge_all_of(self, schema: dict) -> dict:
+        """Unisce le parti di un allOf in un unico schema oggetto."""
+        merged: Dict[str, Any] = {"type": "object", "properties": {}, "required": []}
+        for key in ("description", "nullable"):
+            if key in schema:
+                merged[key] = schema[key]
+        for part in schema["allOf"]:
+            part = self.resolve(part)
+            if "allOf" in part:
+                part = self._merge_all_of(part)
+            merged["properties"].update(part.get("properties") or {})
+            merged["required"].extend(part.get("required") or [])
+        return merged
+
+    def _is_model(self, schema: dict) -> bool:
+        """Uno schema diventa un modello Pydantic se descrive un oggetto con proprietà."""
+        return bool(schema.get("properties")) or "allOf" in schema and len(schema["allOf"]) > 1
+
+    def annotation(self, schema: Any, context: str) -> str:
+        """Annotazione di tipo Python per uno schema, generando i modelli necessari."""
+        if isinstance(schema, dict) and "$ref" in schema:
+            return self._ref_annotation(schema["$ref"])
+        if not isinstance(schema, dict):
+            return "Any"
+
+        nullable = bool(schema.get("nullable"))
+        schema_type = schema.get("type")
+        if isinstance(schema_type, list):
+            nullable = nullable or "null" in schema_type
+            schema_type = next((item for item in schema_type if item != "null"), None)
+
+        if "allOf" in schema and len(schema["allOf"]) == 1:
+            annotation = self.annotation(schema["allOf"][0], context)
+        elif self._is_model(schema):
+            annotation = self._model(self._class_name(context), schema)
+        elif "oneOf" in schema or "anyOf" in schema:
+            options = []
+            for position, option in enumerate(schema.get("oneOf") or schema.get("anyOf")):
+                if isinstance(option, dict) and option.get("type") == "null":
+                    nullable = True
+                    continue
+                option_annotation = self.annotation(option, f"{context}Option{position + 1}")
+                if option_annotation not in options:
+                    options.append(option_annotation)
+            if not options or "Any" in options:
+                annotation = "Any"
+            else:
+                annotation = options[0] if len(options) == 1 else f"Union[{', '.join(options)}]"
+        elif schema.get("enum") and all(isinstance(value, (str, int, bool)) for value in schema["enum"]):
+            annotation = f"Literal[{', '.join(_py_literal(value) for value in schema['enum'])}]"
+        elif schema_type in SCALAR_TYPES:
+            annotation = SCALAR_TYPES[schema_type]
+        elif schema_type == "array":
+            annotation = f"List[{self.annotation(schema.get('items', {}), f'{context}Item')}]"
+        elif schema_type == "object" and isinstance(schema.get("additionalProperties"), dict):
+            value_annotation = self.annotation(schema["additionalProperties"], f"{context}Value")
+            annotation = f"Dict[str, {value_annotation}]"
+        elif schema_type == "object":
+            annotation = "Dict[str, Any]"
+        else:
+            annotation = "Any"
+
+        if nullable and annotation != "Any" and not annotation.startswith("Optional["):
+            annotation = f"Optional[{annotation}]"
+        return annotation
+
+    def _ref_annotation(self, ref: str) -> str:
+        """Annotazione memoizzata per un $ref."""
+        if ref not in self._ref_annotations:
+            target = self.resolve({"$ref": ref})
+            context = ref.rsplit("/", 1)[-1]
+            if self._is_model(target):
+                self._ref_annotations[ref] = self._model(self._class_name(context), target)
+            else:
+                # Segnaposto per gli alias ricorsivi non oggetto (es. array di se stesso)
+                self._ref_annotations[ref] = "Any"
+                self._ref_annotations[ref] = self.annotation(target, context)
+        return self._ref_annotations[ref]
+
+    def _model(self, name: str, schema: dict) -> str:
+        """Accoda uno schema oggetto come modello e ne restituisce il segnaposto."""
+        self._model_schemas[name] = self._merge_all_of(schema) if "allOf" in schema else schema
+        self._model_order.append(name)
+        return f"\0{name}\0"
+
+    def _emit_models(self):
+        """Raggruppa i modelli in moduli, uno per componente fortemente connessa.
+
+        Algoritmo di Tarjan iterativo: un modulo contiene un modello o un intero ciclo
+        di $ref, e i moduli escono in ordine topologico inverso (dipendenze prima),
+        quindi si importano a vicenda senza cicli.
+        """
+        order: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: set = set()
+        for root in self._model_order:
+            if root in order:
+                continue
+            order[root] = lowlink[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._dependencies(root)))]
+            while work:
+                name, dependencies = work[-1]
+                for dependency in dependencies:
+                    if dependency not in order:
+                        order[dependency] = lowlink[dependency] = len(order)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, iter(self._dependencies(dependency))))
+                        break
+                    if dependency in on_stack:
+                        lowlink[name] = min(lowlink[name], order[dependency])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[name])
+                    if lowlink[name] == order[name]:
+                        component = []
+                        while not component or component[-1] != name:
+                            component.append(stack.pop())
+                            on_stack.discard(component[-1])
+                        self.models.append(self._render_module(component))
+
+    def _dependencies(self, name: str) -> List[str]:
+        """Modelli referenziati dai campi di un modello."""
+        return MODEL_MARKER.findall(" ".join(f.annotation for f in self._model_fields[name]))
+
+    def _render_module(self, component: List[str]) -> ModelModule:
+        """Genera il modulo di una componente: i modelli di altri moduli sono importati,
+        quelli del ciclo non ancora definiti diventano forward ref tra apici."""
+        base = _snake_case(component[-1])
+        name = base
+        suffix = 2
+        while name in self._module_names:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        self._module_names.add(name)
+
+        module = ModelModule(name=name, classes=list(component), source="")
+        members = set(component)
+        # Un ciclo si costruisce solo alla fine del modulo, con model_rebuild(): definire
+        # le classi costruirebbe ricorsivamente il ciclo ancora incompleto
+        cyclic = len(component) > 1 or component[0] in self._dependencies(component[0])
+        if cyclic:
+            module.rebuilds = list(component)
+        defined: set = set()
+        sources = []
+        for class_name in component:
+            def reference(match: re.Match) -> str:
+                target = match.group(1)
+                if target not in members:
+                    if target not in module.imports:
+                        module.imports.append(target)
+                    return target
+                if target in defined:
+                    return target
+                return json.dumps(target)
+
+            sources.append(self._render_model(class_name, reference, cyclic))
+            defined.add(class_name)
+        module.source = "\n".join(sources)
+        return module
+
+    def _render_model(self, name: str, reference, deferred: bool = False) -> str:
+        """Genera il sorgente di un modello Pydantic già costruito."""
+        schema = self._model_schemas[name]
+        defer_build = ", defer_build=True" if deferred else ""
+        lines = [
+            f"class {name}(BaseModel):",
+            f'    """{_plain_text(schema.get("description"), f"{name} schema.")}"""',
+            f"    model_config = ConfigDict(populate_by_name=True{defer_build})",
+            "",
+        ]
+        for model_field in self._model_fields[name]:
+            model_field.annotation = MODEL_MARKER.sub(reference, model_field.annotation)
+            lines.append(_render_field(model_field))
+        return "\n".join(lines) + "\n"
+
+    def _schema_fields(self, schema: dict, owner: str) -> List[ToolField]:
+        """Campi Pydantic per le proprietà di uno schema oggetto."""
+        required = set(schema.get("required") or [])
+        taken: set = set()
+        fields = []
+        for raw_name, property_schema in (schema.get("properties") or {}).items():
+            context = f"{owner[:-len('Model')]}{raw_name[:1].upper()}{raw_name[1:]}"
+            fields.append(self._field(raw_name, property_schema, raw_name in required, context, taken))
+        return fields
+
+    def _field(self, raw_name: str, schema: Any, required: bool, context: str, taken: set,
+               description: Any = None, location: str = "query") -> ToolField:
+        """Costruisce un ToolField da uno schema, con vincoli e default."""
+        annotation = self.annotation(schema, context)
+        resolved = self.resolve(schema)
+        name = self._field_name(raw_name, taken)
+        constraints = {}
+        if not self._is_model(resolved) and resolved.get("type") in ("string", "integer", "number", "array"):
+            constraints = {
+                SCHEMA_CONSTRAINTS[key]: value for key, value in resolved.items()
+                if key in SCHEMA_CONSTRAINTS and isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+        default = resolved.get("default")
+        if not required and not isinstance(default, (str, int, float, bool)):
+            default = None
+        if not required and default is None and annotation != "Any" and not annotation.startswith("Optional["):
+            annotation = f"Optional[{annotation}]"
+        return ToolField(
+            name=name,
+            annotation=annotation,
+            description=_plain_text(description or resolved.get("description"), raw_name),
+            required=required,
+            default=default,
+            constraints=constraints,
+            alias=raw_name if name != raw_name else None,
+            location=location,
+        )
+
+    def _operation_tool(self, path: str, method: str, operation: dict, path_item: dict,
+                        tool_names: set) -> ToolSpec:
+        """Costruisce il ToolSpec di una singola operazione."""
+        name = _snake_case(operation.get("operationId") or f"{method}_{path}") or method
+        unique = name
+        suffix = 2
+        while unique in tool_names:
+            unique = f"{name}_{suffix}"
+            suffix += 1
+        tool_names.add(unique)
+        context = unique.replace("_", " ").title().replace(" ", "")
+
+        parameters: Dict[tuple, dict] = {}
+        for parameter in (path_item.get("parameters") or []) + (operation.get("parameters") or []):
+            parameter = self.resolve(parameter)
+            if parameter.get("in") in ("path", "query", "header") and parameter.get("name"):
+                parameters[(parameter["in"], parameter["name"])] = parameter
+
+        taken: set = set()
+        fields = []
+        for (location, raw_name), parameter in parameters.items():
+            schema = parameter.get("schema")
+            media_type = None
+            if schema is None:
+                media_type, media = next(iter((parameter.get("content") or {}).items()), (None, {}))
+                schema = (media or {}).get("schema", {})
+            parameter_field = self._field(
+                raw_name, schema, location == "path" or bool(parameter.get("required")),
+                f"{context}{raw_name[:1].upper()}{raw_name[1:]}", taken,
+                description=parameter.get("description"), location=location,
+            )
+            parameter_field.media_type = media_type
+            fields.append(parameter_field)
+
+        request_body = self.resolve(operation.get("requestBody"))
+        content = request_body.get("content") or {}
+        if content:
+            media_type = next((key for key in content if "json" in key), next(iter(content)))
+            body_name = "request_body" if "body" in taken else "body"
+            body = self._field(
+                body_name, (content[media_type] or {}).get("schema", {}), bool(request_body.get("required")),
+                f"{context}Body", taken, description=request_body.get("description") or "Request body",
+                location="body",
+            )
+            body.alias = None
+            body.media_type = media_type
+            fields.append(body)
+
+        read_only, destructive, idempotent = METHOD_HINTS[method.upper()]
+        return ToolSpec(
+            name=unique,
+            summary=_plain_text(operation.get("summary") or operation.get("description"), f"{method.upper()} {path}"),
+            endpoint=path.lstrip("/"),
+            fields=fields,
+            read_only=read_only,
+            destructive=destructive,
+            idempotent=idempotent,
+            method=method.upper(),
+        )
 
 class MCPBuilder:
     def __init__(self):
         self.project_dir = Path.cwd()
+        self.cache_dir = self.project_dir / ".mcp_builder_cache"
+        self._openapi_indexes: Dict[Path, OpenAPIIndex] = {}
     
     def generate_server(self, config: MCPConfig):
         """Genera un server MCP completo."""
@@ -48,11 +710,34 @@ class MCPBuilder:
     def _generate_python_server(self, config: MCPConfig):
         """Genera server Python usando FastMCP."""
         service_dir = self.project_dir / f"{config.service_name.replace('-', '_')}_mcp"
+
+        # Carica la spec OpenAPI e calcola gli schemi prima di scrivere qualsiasi file
+        index = self._openapi_index(config)
+        if index is not None:
+            print(f"[INFO] OpenAPI spec {config.openapi}: {len(index.tools)} operations")
+            if not index.base_url.startswith(("http://", "https://")):
+                print(f"[WARNING] Relative server URL {index.base_url or '/'!r} in the spec: "
+                      f"set API_HOST in the generated server (placeholder: https://api.{config.service_name}.com)")
+        if config.layout == Layout.LAZY or index is not None:
+            schemas = self._tool_schemas(config)
+            if config.layout == Layout.SINGLE and schemas.get("deep"):
+                raise ValueError(
+                    "OpenAPI $ref graph is too deep for the single-file layout, whose server builds "
+                    "the tool schemas at import: use --layout lazy"
+                )
+
         service_dir.mkdir(exist_ok=True)
         
         # Genera file principale
         self._write_python_server(config, service_dir)
         
+        # Genera benchmark di validazione
+        self._write_validation_benchmark(config, service_dir)
+        
+        # Genera launcher multi-worker per HTTP/SSE
+        if config.transport != Transport.STDIO:
+            self._write_launcher(config, service_dir)
+        
         # Genera file di test
         self._write_python_test(config, service_dir)
         
@@ -85,64 +770,367 @@ class MCPBuilder:
         print(f"[VENV] Virtual environment created in: {service_dir}/.venv")
         print(f"[TEST] To test: cd {service_dir.name}")
         print(f"[TEST] Then: .venv\\Scripts\\python test_server.py")
+        if config.transport != Transport.STDIO:
+            print(f"[PROD] Production: .venv\\Scripts\\python {LAUNCHER_FILE} --workers 4")
     
-    def _write_python_server(self, config: MCPConfig, service_dir: Path):
-        """Scrive il file principale del server Python."""
-        content = f'''#!/usr/bin/env python3
-"""
-{config.service_name.title()} MCP Server
-
-Generated with MCP Builder Snello following Claude's best practices.
-"""
+    def _openapi_index(self, config: MCPConfig) -> Optional[OpenAPIIndex]:
+        """Indice della spec OpenAPI del servizio, se presente."""
+        if config.openapi is None:
+            return None
+        if config.openapi not in self._openapi_indexes:
+            self._openapi_indexes[config.openapi] = OpenAPIIndex.load(
+                config.openapi, config.service_name, self.cache_dir
+            )
+        return self._openapi_indexes[config.openapi]
+
+    def _tool_specs(self, config: MCPConfig) -> List[ToolSpec]:
+        """Restituisce i tool da generare per il servizio."""
+        index = self._openapi_index(config)
+        if index is not None:
+            return index.tools
+        return [
+            ToolSpec(
+                name="list_resources",
+                summary=f"List resources from {config.service_name}",
+                endpoint="resources",
+                fields=[
+                    ToolField("limit", "int", "Number of results", required=False, default=20),
+                    ToolField("offset", "int", "Skip results", required=False, default=0),
+                ],
+            ),
+            ToolSpec(
+                name="get_resource",
+                summary=f"Get a specific resource from {config.service_name}",
+                endpoint="resources/{resource_id}",
+                fields=[
+                    ToolField("resource_id", "str", "Resource ID", constraints={"min_length": 1}),
+                ],
+            ),
+        ]
+
+    def _tool_name(self, config: MCPConfig, tool: ToolSpec) -> str:
+        """Nome MCP del tool (es. github-list_resources)."""
+        return f"{config.service_name}-{tool.name}"
+
+    def _function_name(self, config: MCPConfig, tool: ToolSpec) -> str:
+        """Nome della funzione Python che implementa il tool."""
+        return f"{config.service_name.replace('-', '_')}_{tool.name}"
+
+    def _model_name(self, config: MCPConfig, tool: ToolSpec) -> str:
+        """Nome del modello Pydantic di input del tool."""
+        tool_camel = tool.name.replace('_', ' ').title().replace(' ', '')
+        return f"{config.service_name.replace('-', '').title()}{tool_camel}Input"
+
+    def _tool_annotations(self, config: MCPConfig, tool: ToolSpec) -> dict:
+        """Annotazioni MCP del tool."""
+        return {
+            'title': f"{config.service_name.title()} {tool.name.replace('_', ' ').title()}",
+            'readOnlyHint': tool.read_only,
+            'destructiveHint': tool.destructive,
+            'idempotentHint': tool.idempotent,
+            'openWorldHint': tool.open_world,
+        }
+
+    def _tool_docstring(self, config: MCPConfig, tool: ToolSpec) -> str:
+        """Docstring della funzione del tool, usata anche come descrizione MCP."""
+        model_name = self._model_name(config, tool)
+        return f'''{tool.summary}
 
-import asyncio
-import json
-import httpx
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
-from mcp.server.fastmcp import FastMCP
+    Args:
+        params ({model_name}): Validated input parameters
 
-# Initialize the MCP server
-mcp = FastMCP("{config.service_name}_mcp")
+    Returns:
+        str: JSON-formatted response containing operation results
+    '''
+
+    def _render_input_model(self, config: MCPConfig, tool: ToolSpec) -> str:
+        """Genera il sorgente del modello Pydantic di input."""
+        lines = [
+            "@register_input_model",
+            f"class {self._model_name(config, tool)}(BaseModel):",
+            f'    """Input model for {self._tool_name(config, tool)} operation."""',
+            "    model_config = ConfigDict(",
+            "        str_strip_whitespace=True,",
+            "        validate_assignment=True,",
+            "        revalidate_instances='never',",
+            "        extra='forbid'",
+            "    )",
+            "",
+        ]
+        lines.extend(_render_field(tool_field) for tool_field in tool.fields)
+        return "\n".join(lines) + "\n"
+
+    def _render_tool_function(self, config: MCPConfig, tool: ToolSpec, decorated: bool = True) -> str:
+        """Genera il sorgente della funzione del tool, con o senza @mcp.tool."""
+        tool_name = self._tool_name(config, tool)
+        decorator = ""
+        if decorated:
+            decorator = f'''@mcp.tool(
+    name="{tool_name}",
+    annotations={self._tool_annotations(config, tool)!r}
+)
+'''
+        return f'''{decorator}async def {self._function_name(config, tool)}(params: {self._model_name(config, tool)}) -> str:
+    """{self._tool_docstring(config, tool)}"""
+{self._render_tool_body(config, tool)}
+    except Exception as e:
+        return _handle_api_error(e)
+'''
 
-# Constants
-API_BASE_URL = "https://api.{config.service_name}.com/v1"
-CHARACTER_LIMIT = 25000  # Maximum response size in characters
+    def _render_tool_body(self, config: MCPConfig, tool: ToolSpec) -> str:
+        """Genera il corpo del tool: chiamata API per le operazioni OpenAPI, TODO altrimenti."""
+        hedged = config.hedge_percentile is not None and tool.idempotent
+        if tool.method is None:
+            hedge = ", hedge=True" if hedged else ""
+            return f'''    try:
+        # TODO: Implement {self._tool_name(config, tool)} logic
+        # Example API call structure:
+        # data = await _make_api_request("{tool.endpoint}", params=params.model_dump(){hedge})
+        # return json.dumps(data, indent=2)
 
-# Pydantic Models for Input Validation
-class {config.service_name.replace('-', '').title()}ListResourcesInput(BaseModel):
-    """Input model for {config.service_name}-list_resources operation."""
-    model_config = ConfigDict(
-        str_strip_whitespace=True,
-        validate_assignment=True,
-        extra='forbid'
-    )
+        return json.dumps({{"status": "success", "message": "{self._tool_name(config, tool)} implemented"}})
+'''
 
-    limit: int = Field(default=20, description="Number of results")
-    offset: int = Field(default=0, description="Skip results")
+        body = next((tool_field for tool_field in tool.fields if tool_field.location == "body"), None)
+        media_type = (body.media_type if body is not None else None) or "application/json"
+        # I body non JSON (salvo i form) sono inviati così come sono, con il loro Content-Type
+        raw_body = "json" not in media_type and media_type not in ("application/x-www-form-urlencoded", "multipart/form-data")
 
-class {config.service_name.replace('-', '').title()}GetResourceInput(BaseModel):
-    """Input model for {config.service_name}-get_resource operation."""
-    model_config = ConfigDict(
-        str_strip_whitespace=True,
-        validate_assignment=True,
-        extra='forbid'
-    )
+        arguments = [_py_literal(tool.endpoint), f"method={_py_literal(tool.method)}"]
+        for location, keyword_name in (("path", "path_params"), ("query", "params"), ("header", "headers")):
+            location_fields = sorted(
+                (tool_field for tool_field in tool.fields if tool_field.location == location),
+                key=lambda tool_field: tool_field.name,
+            )
+            content_type = ""
+            if location == "header" and raw_body and "*" not in media_type:
+                content_type = f"{_py_literal('Content-Type')}: {_py_literal(media_type)}"
+            if not location_fields:
+                if content_type:
+                    arguments.append(f"{keyword_name}={{{content_type}}}")
+                continue
+            include = "{" + ", ".join(_py_literal(tool_field.name) for tool_field in location_fields) + "}"
+            dump = f"params.model_dump(mode=\"json\", by_alias=True, exclude_none=True, include={include})"
+            # I parametri dichiarati con content JSON vanno serializzati, non passati come dict
+            encoded = {
+                tool_field.alias or tool_field.name for tool_field in location_fields
+                if tool_field.media_type and "json" in tool_field.media_type
+            }
+            if encoded:
+                names = "{" + ", ".join(_py_literal(name) for name in sorted(encoded)) + "}"
+                plain = "str(value)" if location == "header" else "value"
+                dump = f"{{key: json.dumps(value) if key in {names} else {plain} for key, value in {dump}.items()}}"
+            elif location == "header":
+                dump = f"{{key: str(value) for key, value in {dump}.items()}}"
+            if content_type:
+                dump = f"{{**{dump}, {content_type}}}"
+            arguments.append(f"{keyword_name}={dump}")
+        if body is not None:
+            value = f"params.model_dump(mode=\"json\", by_alias=True, exclude_none=True).get({_py_literal(body.name)})"
+            if "json" in media_type:
+                arguments.append(f"json={value}")
+            elif media_type == "application/x-www-form-urlencoded":
+                arguments.append(f"data={value}")
+            elif media_type == "multipart/form-data":
+                arguments.append(
+                    "files={key: (None, value if isinstance(value, str) else json.dumps(value)) "
+                    f"for key, value in ({value} or {{}}).items()}}"
+                )
+            elif body.annotation in ("str", "Optional[str]"):
+                arguments.append(f"content=params.{body.name}")
+            else:
+                # Schema non testuale per un media type non JSON: il testo JSON è la resa più fedele
+                content = f"json.dumps({value})"
+                if not body.required:
+                    content = f"{content} if params.{body.name} is not None else None"
+                arguments.append(f"content={content}")
+        if hedged:
+            arguments.append("hedge=True")
+        call = ",\n            ".join(arguments)
+        return f'''    try:
+        data = await _make_api_request(
+            {call},
+        )
+        return json.dumps(data, indent=2)
+'''
 
-    resource_id: str = Field(description="Resource ID", min_length=1)
+    def _render_constants(self, config: MCPConfig) -> str:
+        """Genera le costanti condivise del server."""
+        index = self._openapi_index(config)
+        if index is None:
+            base_url = _py_literal(f"https://api.{config.service_name}.com/v1")
+        elif index.base_url.startswith(("http://", "https://")):
+            base_url = _py_literal(index.base_url)
+        else:
+            base_url = f"API_HOST + {_py_literal(index.base_url)}"
+        constants = f'''# Constants
+{self._render_api_host(config)}API_BASE_URL = {base_url}
+CHARACTER_LIMIT = 25000  # Maximum response size in characters
+'''
+        if config.hedge_percentile is not None:
+            constants += f'''
+# Request hedging for idempotent tools
+HEDGE_PERCENTILE = {config.hedge_percentile!r}  # Send a duplicate when a request is slower than this percentile
+HEDGE_WINDOW = 200  # Recent latencies kept per endpoint
+HEDGE_MIN_SAMPLES = 20  # No hedging until an endpoint has this many measurements
+HEDGE_BUDGET = 0.05  # Hedges allowed per request, across all endpoints (caps extra upstream load)
+HEDGE_BURST = 10  # Hedges that can be spent at once when the budget is full
+'''
+        return constants
+
+    def _render_api_host(self, config: MCPConfig) -> str:
+        """Costante dell'host API quando la spec dichiara solo un URL relativo."""
+        index = self._openapi_index(config)
+        if index is None or index.base_url.startswith(("http://", "https://")):
+            return ""
+        return f'''# TODO: set the API host: the OpenAPI spec only declares the relative server URL {_py_literal(index.base_url or "/")}
+API_HOST = {_py_literal(f"https://api.{config.service_name}.com")}
+'''
 
-# Shared utility functions
-async def _make_api_request(endpoint: str, method: str = "GET", **kwargs) -> dict:
+    def _render_api_helpers(self, config: MCPConfig) -> str:
+        """Genera le funzioni di utilità per le chiamate API."""
+        if config.hedge_percentile is None:
+            request_helpers = '''async def _make_api_request(
+    endpoint: str, method: str = "GET", path_params: Optional[Dict[str, Any]] = None, **kwargs
+) -> Any:
     """Reusable function for all API calls."""
+    if path_params:
+        endpoint = re.sub(r"\\{([^}]+)\\}", lambda match: quote(str(path_params[match.group(1)]), safe=""), endpoint)
     async with httpx.AsyncClient() as client:
         response = await client.request(
             method,
-            f"{{API_BASE_URL}}/{{endpoint}}",
+            f"{API_BASE_URL}/{endpoint}",
             timeout=30.0,
             **kwargs
         )
         response.raise_for_status()
-        return response.json()
+        return response.json() if response.content else None
+'''
+        else:
+            request_helpers = '''async def _make_api_request(
+    endpoint: str, method: str = "GET", path_params: Optional[Dict[str, Any]] = None,
+    hedge: bool = False, **kwargs
+) -> Any:
+    """Reusable function for all API calls.
+
+    With hedge=True (idempotent tools only) a duplicate request is sent when the first
+    one is slower than the HEDGE_PERCENTILE latency of its endpoint, and the first
+    response wins.
+    """
+    key = f"{method} {endpoint}"
+    if path_params:
+        endpoint = re.sub(r"\\{([^}]+)\\}", lambda match: quote(str(path_params[match.group(1)]), safe=""), endpoint)
+    url = f"{API_BASE_URL}/{endpoint}"
+    if hedge:
+        return await _hedged_request(key, method, url, **kwargs)
+    return await _send_request(method, url, **kwargs)
+
+async def _send_request(method: str, url: str, **kwargs) -> Any:
+    """Send one API request and decode its JSON response."""
+    async with httpx.AsyncClient() as client:
+        response = await client.request(method, url, timeout=30.0, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+class _HedgePolicy:
+    """Live latency percentiles per endpoint and the global hedge budget.
+
+    Every hedged call deposits HEDGE_BUDGET tokens (up to HEDGE_BURST) and every
+    duplicate request spends one, so duplicates stay below HEDGE_BUDGET of the calls.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, deque] = {}
+        self.tokens = float(HEDGE_BURST)
+
+    def delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while the endpoint has too few samples."""
+        samples = self.latencies.get(key)
+        if samples is None or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        # Nearest-rank percentile
+        return ordered[max(math.ceil(len(ordered) * HEDGE_PERCENTILE / 100) - 1, 0)]
+
+    def record(self, key: str, seconds: float) -> None:
+        """Add a request latency to the endpoint window."""
+        if key not in self.latencies:
+            self.latencies[key] = deque(maxlen=HEDGE_WINDOW)
+        self.latencies[key].append(seconds)
+
+    def deposit(self) -> None:
+        """Earn budget for one hedged call."""
+        self.tokens = min(self.tokens + HEDGE_BUDGET, HEDGE_BURST)
+
+    def withdraw(self) -> bool:
+        """Spend budget for one duplicate request, if any is left."""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+_HEDGE = _HedgePolicy()
+
+async def _timed_request(key: str, method: str, url: str, **kwargs) -> Any:
+    """Send one API request and record its latency for the endpoint.
+
+    A request cancelled by a faster duplicate records the time it ran so far,
+    so slow requests keep counting towards the percentile.
+    """
+    started = time.perf_counter()
+    try:
+        result = await _send_request(method, url, **kwargs)
+    except asyncio.CancelledError:
+        _HEDGE.record(key, time.perf_counter() - started)
+        raise
+    _HEDGE.record(key, time.perf_counter() - started)
+    return result
+
+async def _hedged_request(key: str, method: str, url: str, **kwargs) -> Any:
+    """Send the request, duplicate it if it is slow, and return the first successful response.
+
+    A failed attempt (e.g. a 429 caused by the duplicate) only fails the call when
+    every launched attempt has failed; the first error is raised.
+    """
+    _HEDGE.deposit()
+    tasks = [asyncio.ensure_future(_timed_request(key, method, url, **kwargs))]
+    try:
+        delay = _HEDGE.delay(key)
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and _HEDGE.withdraw():
+                tasks.append(asyncio.ensure_future(_timed_request(key, method, url, **kwargs)))
+        errors = []
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.index):
+                if task.exception() is None:
+                    return task.result()
+                errors.append(task.exception())
+        raise errors[0]
+    finally:
+        # The losing request is cancelled (also when the caller itself is cancelled)
+        for task in tasks:
+            task.cancel()
+'''
+        return '''# Shared utility functions
+''' + request_helpers + '''
+# Validation fast paths for internal and batch callers
+BATCH_ADAPTERS: Dict[type, TypeAdapter] = {}  # Input model -> list validator
+
+def register_input_model(model: type) -> type:
+    """Build the list validator of a tool input model once, when its module is imported."""
+    BATCH_ADAPTERS[model] = TypeAdapter(List[model])
+    return model
+
+def validate_batch(model: type, items: List[Any]) -> List[Any]:
+    """Validate many inputs of one tool in a single pydantic-core call.
+
+    Input models never revalidate instances: items that are already validated
+    instances (e.g. kept in a cache) are returned unchanged, at no cost.
+    """
+    return BATCH_ADAPTERS[model].validate_python(items)
 
 def _handle_api_error(e: Exception) -> str:
     """Consistent error formatting across all tools."""
@@ -153,71 +1141,419 @@ def _handle_api_error(e: Exception) -> str:
             return "Error: Permission denied. You don't have access to this resource."
         elif e.response.status_code == 429:
             return "Error: Rate limit exceeded. Please wait before making more requests."
-        return f"Error: API request failed with status {{e.response.status_code}}"
+        return f"Error: API request failed with status {e.response.status_code}"
     elif isinstance(e, httpx.TimeoutException):
         return "Error: Request timed out. Please try again."
     elif isinstance(e, httpx.ConnectError):
         return "Error: Connection failed. Please check your internet connection."
-    return f"Error: Unexpected error occurred: {{type(e).__name__}}: {{str(e)}}"
+    return f"Error: Unexpected error occurred: {type(e).__name__}: {str(e)}"
+'''
+
+    def _hedge_imports(self, config: MCPConfig, with_asyncio: bool = False) -> str:
+        """Import aggiuntivi dei moduli con gli helper API quando l'hedging è attivo."""
+        if config.hedge_percentile is None:
+            return ""
+        return ("import asyncio\n" if with_asyncio else "") + "import math\nimport time\nfrom collections import deque\n"
+
+    def _typing_imports(self, config: MCPConfig) -> str:
+        """Nomi importati da typing nei moduli generati."""
+        if config.openapi is not None:
+            return "Optional, List, Dict, Any, Literal, Union"
+        return "Optional, List, Dict, Any"
+
+    def _model_modules(self, config: MCPConfig) -> List[ModelModule]:
+        """Moduli dei modelli degli schemi OpenAPI, dipendenze prima."""
+        index = self._openapi_index(config)
+        return index.models if index is not None else []
+
+    def _render_component_models(self, config: MCPConfig) -> str:
+        """Genera i modelli Pydantic degli schemi OpenAPI in un unico sorgente (layout single)."""
+        modules = self._model_modules(config)
+        if not modules:
+            return ""
+        rebuilds = "".join(f"{name}.model_rebuild()\n" for module in modules for name in module.rebuilds)
+        return "\n".join(module.source for module in modules) + ("\n" + rebuilds if rebuilds else "") + "\n"
+
+    def _render_model_imports(self, config: MCPConfig, class_names: List[str], closure: bool = False) -> str:
+        """Import dei modelli dai moduli del package _models (layout lazy).
+
+        Con closure i moduli di tutte le dipendenze sono importati in ordine, dipendenze
+        prima: ogni modulo trova già caricate le sue, e una catena lunga di $ref non
+        annida un import dentro l'altro.
+        """
+        modules = self._model_modules(config)
+        owners = {class_name: module for module in modules for class_name in module.classes}
+        needed = {owners[class_name].name for class_name in class_names}
+        pending = [owners[class_name] for class_name in class_names] if closure else []
+        while pending:
+            for class_name in pending.pop().imports:
+                if owners[class_name].name not in needed:
+                    needed.add(owners[class_name].name)
+                    pending.append(owners[class_name])
+
+        lines = []
+        for module in modules:
+            if module.name not in needed:
+                continue
+            classes = [class_name for class_name in module.classes if class_name in class_names]
+            if classes:
+                lines.append(f"from _models.{module.name} import {', '.join(sorted(classes))}\n")
+            else:
+                lines.append(f"import _models.{module.name}\n")
+        return "".join(lines)
+
+    def _write_python_server(self, config: MCPConfig, service_dir: Path):
+        """Scrive il server Python nel layout richiesto."""
+        if config.layout == Layout.LAZY:
+            self._write_lazy_python_server(config, service_dir)
+        else:
+            self._write_single_python_server(config, service_dir)
+
+    def _write_single_python_server(self, config: MCPConfig, service_dir: Path):
+        """Scrive il file principale del server Python."""
+        tools = self._tool_specs(config)
+        models = "\n".join(self._render_input_model(config, tool) for tool in tools)
+        functions = "\n".join(self._render_tool_function(config, tool) for tool in tools)
+        content = f'''#!/usr/bin/env python3
+"""
+{config.service_name.title()} MCP Server
 
+Generated with MCP Builder Snello following Claude's best practices.
+"""
+
+import asyncio
+import json
+import re
+{self._hedge_imports(config)}import httpx
+from typing import {self._typing_imports(config)}
+from urllib.parse import quote
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from mcp.server.fastmcp import FastMCP
+
+# Initialize the MCP server
+mcp = FastMCP("{config.service_name}_mcp")
+
+{self._render_constants(config)}
+{self._render_api_helpers(config)}
+# Pydantic Models for Input Validation
+{self._render_component_models(config)}{models}
 # Tool definitions
-@mcp.tool(
-    name="{config.service_name}-list_resources",
-    annotations={{'title': '{config.service_name.title()} List Resources', 'readOnlyHint': True, 'destructiveHint': False, 'idempotentHint': True, 'openWorldHint': True}}
-)
-async def {config.service_name.replace('-', '_')}_list_resources(params: {config.service_name.replace('-', '').title()}ListResourcesInput) -> str:
-    """List resources from {config.service_name}
-    
-    Args:
-        params ({config.service_name.replace('-', '').title()}ListResourcesInput): Validated input parameters
+{functions}
+if __name__ == "__main__":
+    mcp.run(transport="{FASTMCP_TRANSPORTS[config.transport.value]}")
+'''
 
-    Returns:
-        str: JSON-formatted response containing operation results
+        with open(service_dir / f"{config.service_name.replace('-', '_')}_mcp.py", "w") as f:
+            f.write(content)
+
+    def _model_namespace(self, config: MCPConfig) -> dict:
+        """Namespace con i modelli condivisi, per calcolare gli schemi a generazione."""
+        namespace = {
+            "BaseModel": BaseModel, "Field": Field, "ConfigDict": ConfigDict,
+            "Optional": Optional, "List": List, "Dict": Dict, "Any": Any,
+            "Literal": Literal, "Union": Union, "register_input_model": lambda model: model,
+        }
+        for module in self._model_modules(config):
+            exec(module.source, namespace)
+            for name in module.rebuilds:
+                namespace[name].model_rebuild(_types_namespace=namespace)
+        return namespace
+
+    def _input_model_schemas(self, config: MCPConfig, tools: List[ToolSpec]) -> tuple:
+        """Costruisce modelli e input dei tool e ne genera gli schemi JSON in un passaggio."""
+        namespace = self._model_namespace(config)
+        for tool in tools:
+            exec(self._render_input_model(config, tool), namespace)
+        models = [(namespace[self._model_name(config, tool)], "validation") for tool in tools]
+        refs, top_level = models_json_schema(models)
+        return models, refs, top_level
+
+    def _tool_schemas(self, config: MCPConfig) -> dict:
+        """Calcola in un solo passaggio gli schemi di input di tutti i tool.
+
+        Le definizioni ($defs) sono condivise: ogni tool elenca solo quelle che
+        usa, e il server ricompone lo schema identico a quello di FastMCP.
+        """
+        index = self._openapi_index(config)
+        if index is not None and index.schemas:
+            return index.schemas
+
+        tools = self._tool_specs(config)
+        deep = False
+        try:
+            models, refs, top_level = self._input_model_schemas(config, tools)
+        except RecursionError:
+            # Grafo di $ref profondo: pydantic costruisce modelli e schemi ricorsivamente
+            models, refs, top_level = _run_deep(self._input_model_schemas, config, tools)
+            deep = True
+        definitions = top_level.get("$defs", {})
+
+        references: Dict[str, List[str]] = {}
+        tool_schemas = {}
+        for tool, model in zip(tools, models):
+            model_ref = refs[model]["$ref"]
+            closure = set()
+            pending = [model_ref.rsplit("/", 1)[-1]]
+            while pending:
+                name = pending.pop()
+                if name in closure:
+                    continue
+                closure.add(name)
+                if name not in references:
+                    references[name] = re.findall(r'"#/\$defs/([^"]+)"', json.dumps(definitions[name]))
+                pending.extend(references[name])
+            tool_schemas[tool.name] = {
+                "input_schema": {
+                    "properties": {"params": {"$ref": model_ref}},
+                    "required": ["params"],
+                    "title": f"{self._function_name(config, tool)}Arguments",
+                    "type": "object",
+                },
+                "defs": sorted(closure),
+            }
+
+        schemas = {"definitions": definitions, "tools": tool_schemas, "deep": deep}
+        if index is not None:
+            index.schemas = schemas
+            index.save()
+        return schemas
+
+    def _tool_registry(self, config: MCPConfig) -> dict:
+        """Costruisce il registry statico dei tool per il layout lazy."""
+        schemas = self._tool_schemas(config)
+        tools = {}
+        for tool in self._tool_specs(config):
+            function_name = self._function_name(config, tool)
+            tools[self._tool_name(config, tool)] = {
+                "module": f"tools.{tool.name}",
+                "handler": function_name,
+                "model": self._model_name(config, tool),
+                "description": self._tool_docstring(config, tool),
+                "annotations": self._tool_annotations(config, tool),
+                **schemas["tools"][tool.name],
+                "output_schema": {
+                    "properties": {"result": {"title": "Result", "type": "string"}},
+                    "required": ["result"],
+                    "title": f"{function_name}Output",
+                    "type": "object",
+                },
+            }
+        return {"definitions": schemas["definitions"], "tools": tools}
+
+    def _write_model_modules(self, config: MCPConfig, service_dir: Path):
+        """Scrive il package _models: un modulo per schema (o ciclo di $ref), importato
+        solo dai tool che lo usano, con le sue dipendenze."""
+        modules = self._model_modules(config)
+        legacy_file = service_dir / "_models.py"  # Layout precedente: un unico modulo
+        if legacy_file.exists():
+            legacy_file.unlink()
+        if not modules:
+            return
+
+        service_title = config.service_name.title()
+        models_dir = service_dir / "_models"
+        models_dir.mkdir(exist_ok=True)
+        with open(models_dir / "__init__.py", "w", encoding="utf-8") as f:
+            f.write(f'''"""
+Pydantic models for the {service_title} API schemas used by tool inputs.
+
+One module per schema, or per $ref cycle, imported with the first tool that needs it.
+"""
+''')
+
+        for module in modules:
+            rebuild = "".join(f"{name}.model_rebuild()\n" for name in module.rebuilds)
+            if rebuild:
+                rebuild = "\n" + rebuild
+            if len(module.classes) == 1:
+                summary = f"{module.classes[0]} for {service_title} MCP Server."
+            else:
+                summary = f"$ref cycle of {len(module.classes)} models for {service_title} MCP Server."
+            content = f'''"""
+{summary}
+"""
+
+from typing import {self._typing_imports(config)}
+from pydantic import BaseModel, Field, ConfigDict
+
+{self._render_model_imports(config, module.imports)}
+
+{module.source}{rebuild}'''
+            with open(models_dir / f"{module.name}.py", "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def _write_lazy_python_server(self, config: MCPConfig, service_dir: Path):
+        """Scrive il server Python con registry statico e tool importati al primo uso."""
+        service_name_clean = config.service_name.replace('-', '_')
+        service_title = config.service_name.title()
+
+        registry = self._tool_registry(config)
+        with open(service_dir / "tool_registry.json", "w", encoding="utf-8") as f:
+            json.dump(registry, f, separators=(",", ":"))
+
+        common_content = f'''"""
+Shared API helpers for {service_title} MCP Server tools.
+"""
+
+import re
+{self._hedge_imports(config, with_asyncio=True)}import httpx
+from typing import Optional, List, Dict, Any
+from urllib.parse import quote
+from pydantic import TypeAdapter
+
+{self._render_constants(config)}
+{self._render_api_helpers(config)}'''
+        with open(service_dir / "_common.py", "w", encoding="utf-8") as f:
+            f.write(common_content)
+
+        self._write_model_modules(config, service_dir)
+
+        tools_dir = service_dir / "tools"
+        tools_dir.mkdir(exist_ok=True)
+        with open(tools_dir / "__init__.py", "w", encoding="utf-8") as f:
+            f.write(f'"""Tool modules for {service_title} MCP Server, imported on first call."""\n')
+
+        for tool in self._tool_specs(config):
+            model_imports = self._render_model_imports(config, tool.models, closure=True)
+            tool_content = f'''"""
+{self._tool_name(config, tool)} tool for {service_title} MCP Server.
+"""
+
+import json
+from typing import {self._typing_imports(config)}
+from pydantic import BaseModel, Field, ConfigDict
+
+from _common import _make_api_request, _handle_api_error, register_input_model
+{model_imports}
+
+{self._render_input_model(config, tool)}
+
+{self._render_tool_function(config, tool, decorated=False)}'''
+            with open(tools_dir / f"{tool.name}.py", "w", encoding="utf-8") as f:
+                f.write(tool_content)
+
+        content = f'''#!/usr/bin/env python3
+"""
+{service_title} MCP Server
+
+Generated with MCP Builder Snello following Claude's best practices.
+
+Lazy layout: tool metadata and input schemas are read from tool_registry.json,
+and each module under tools/ is imported only when its tool is first called.
+"""
+
+import importlib
+import json
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Tuple
+from pydantic import ValidationError
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.types import TextContent, Tool, ToolAnnotations
+
+# Static tool registry: metadata and JSON schemas precomputed at generation time.
+# Schema definitions are stored once and shared by every tool that uses them.
+_REGISTRY = json.loads(Path(__file__).with_name("tool_registry.json").read_text(encoding="utf-8"))
+TOOL_REGISTRY: Dict[str, Dict[str, Any]] = _REGISTRY["tools"]
+SCHEMA_DEFINITIONS: Dict[str, Any] = _REGISTRY["definitions"]
+DEEP_RECURSION_LIMIT = {DEEP_RECURSION_LIMIT}
+DEEP_STACK_SIZE = {DEEP_STACK_SIZE}
+
+class LazyFastMCP(FastMCP):
+    """FastMCP server that serves registry tools without importing them upfront."""
+
+    async def list_tools(self) -> List[Tool]:
+        """List registry tools, followed by any tool added with @mcp.tool."""
+        return list(_registry_tools()) + await super().list_tools()
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Import the tool on first use, validate its input and run it."""
+        if name not in TOOL_REGISTRY:
+            return await super().call_tool(name, arguments)
+        handler, model = _load_tool(name)
+        try:
+            # A validated instance passed by an internal caller is returned unchanged
+            params = model.model_validate(arguments.get("params"))
+        except ValidationError as e:
+            raise ToolError(f"Error executing tool {{name}}: {{e}}") from e
+        result = await handler(params)
+        return [TextContent(type="text", text=result)], {{"result": result}}
+
+@lru_cache(maxsize=None)
+def _registry_tools() -> Tuple[Tool, ...]:
+    """Build the MCP tool listing once, from registry metadata only."""
+    return tuple(
+        Tool(
+            name=name,
+            description=entry["description"],
+            inputSchema={{**entry["input_schema"], "$defs": {{ref: SCHEMA_DEFINITIONS[ref] for ref in entry["defs"]}}}},
+            outputSchema=entry["output_schema"],
+            annotations=ToolAnnotations(**entry["annotations"]),
+        )
+        for name, entry in TOOL_REGISTRY.items()
+    )
+
+@lru_cache(maxsize=None)
+def _load_tool(name: str) -> Tuple[Any, Any]:
+    """Import the tool module and return its (handler, input model) pair."""
+    entry = TOOL_REGISTRY[name]
+    module = import_tool_module(entry["module"])
+    return getattr(module, entry["handler"]), getattr(module, entry["model"])
+
+def import_tool_module(module_name: str) -> ModuleType:
+    """Import a tool module with its models.
+
+    Pydantic builds models recursively: when a long $ref chain or cycle exceeds the
+    default recursion limit, the import runs again in a thread with a large stack
+    and a raised limit.
     """
     try:
-        # TODO: Implement {config.service_name}-list_resources logic
-        # Example API call structure:
-        # data = await _make_api_request("resources", params=params.model_dump())
-        # return json.dumps(data, indent=2)
-        
-        return json.dumps({{"status": "success", "message": "{config.service_name}-list_resources implemented"}})
-        
-    except Exception as e:
-        return _handle_api_error(e)
+        return importlib.import_module(module_name)
+    except RecursionError:
+        pass
 
-@mcp.tool(
-    name="{config.service_name}-get_resource",
-    annotations={{'title': '{config.service_name.title()} Get Resource', 'readOnlyHint': True, 'destructiveHint': False, 'idempotentHint': True, 'openWorldHint': True}}
-)
-async def {config.service_name.replace('-', '_')}_get_resource(params: {config.service_name.replace('-', '').title()}GetResourceInput) -> str:
-    """Get a specific resource from {config.service_name}
-    
-    Args:
-        params ({config.service_name.replace('-', '').title()}GetResourceInput): Validated input parameters
+    outcome: Dict[str, Any] = {{}}
 
-    Returns:
-        str: JSON-formatted response containing operation results
-    """
+    def target():
+        try:
+            outcome["module"] = importlib.import_module(module_name)
+        except BaseException as e:
+            outcome["error"] = e
+
+    recursion_limit = sys.getrecursionlimit()
+    stack_size = threading.stack_size(DEEP_STACK_SIZE)
+    sys.setrecursionlimit(max(recursion_limit, DEEP_RECURSION_LIMIT))
     try:
-        # TODO: Implement {config.service_name}-get_resource logic
-        # Example API call structure:
-        # data = await _make_api_request("resources/{{resource_id}}", params=params.model_dump())
-        # return json.dumps(data, indent=2)
-        
-        return json.dumps({{"status": "success", "message": "{config.service_name}-get_resource implemented"}})
-        
-    except Exception as e:
-        return _handle_api_error(e)
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+        threading.stack_size(stack_size)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["module"]
+
+# Initialize the MCP server
+mcp = LazyFastMCP("{config.service_name}_mcp")
 
 if __name__ == "__main__":
-    mcp.run(transport="{config.transport.value}")
+    mcp.run(transport="{FASTMCP_TRANSPORTS[config.transport.value]}")
 '''
-        
-        with open(service_dir / f"{config.service_name.replace('-', '_')}_mcp.py", "w") as f:
+
+        with open(service_dir / f"{service_name_clean}_mcp.py", "w", encoding="utf-8") as f:
             f.write(content)
-    
+
     def _write_python_test(self, config: MCPConfig, service_dir: Path):
         """Scrive il file di test Python."""
+        if config.layout == Layout.LAZY:
+            self._write_lazy_python_test(config, service_dir)
+            return
+
         content = f'''#!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
@@ -267,7 +1603,7 @@ def test_server():
         import {config.service_name.replace('-', '_')}_mcp as mcp_module
         
         # Test che le funzioni tool principali esistano
-        expected_functions = ['{config.service_name.replace('-', '_')}_list_resources', '{config.service_name.replace('-', '_')}_get_resource']
+        expected_functions = {[self._function_name(config, tool) for tool in self._tool_specs(config)]!r}
         found_functions = []
         
         for func_name in expected_functions:
@@ -299,13 +1635,463 @@ if __name__ == "__main__":
         with open(service_dir / "test_server.py", "w") as f:
             f.write(content)
     
+    def _write_lazy_python_test(self, config: MCPConfig, service_dir: Path):
+        """Scrive il file di test Python per il layout lazy."""
+        service_name_clean = config.service_name.replace('-', '_')
+        expected_tools = [self._tool_name(config, tool) for tool in self._tool_specs(config)]
+        content = f'''#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test file for {config.service_name} MCP Server (lazy layout)
+
+Run this to test your generated MCP server:
+    python test_server.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+def test_server():
+    """Test the generated MCP server."""
+    server_file = Path("{service_name_clean}_mcp.py")
+    if not server_file.exists():
+        print("[ERROR] Server file {service_name_clean}_mcp.py not found in current directory!")
+        return False
+
+    print("[TEST] Testing {service_name_clean}_mcp.py...")
+
+    # Test basic import
+    try:
+        import {service_name_clean}_mcp as mcp_module
+        TOOL_REGISTRY = mcp_module.TOOL_REGISTRY
+        print("[OK] Server imports successfully")
+    except Exception as e:
+        print(f"[ERROR] Import failed: {{e}}")
+        return False
+
+    # Tool modules must not be imported at startup
+    eager_modules = [entry["module"] for entry in TOOL_REGISTRY.values() if entry["module"] in sys.modules]
+    if eager_modules:
+        print("[FAIL] Tool modules imported at startup: " + str(eager_modules))
+        return False
+    print("[OK] No tool module imported at startup")
+
+    # Tool listing comes from the registry alone
+    try:
+        listed = [tool.name for tool in asyncio.run(mcp_module.mcp.list_tools())]
+        expected_tools = {expected_tools!r}
+        for tool_name in expected_tools:
+            if tool_name not in listed:
+                print('  [FAIL] Missing tool: ' + tool_name)
+                return False
+            print('  [OK] ' + tool_name + ' listed')
+    except Exception as e:
+        print('[ERROR] Tool listing failed: ' + str(e))
+        return False
+
+    # Handlers and models resolve on demand
+    try:
+        for tool_name in expected_tools:
+            handler, model = mcp_module._load_tool(tool_name)
+            if not callable(handler):
+                print('  [FAIL] ' + tool_name + ' handler is not callable')
+                return False
+            print('  [OK] ' + tool_name + ' handler loaded: ' + handler.__name__ + '(' + model.__name__ + ')')
+    except Exception as e:
+        print('[ERROR] Tool loading failed: ' + str(e))
+        return False
+
+    print("[OK] All basic tests passed!")
+    return True
+
+if __name__ == "__main__":
+    success = test_server()
+    sys.exit(0 if success else 1)
+'''
+
+        with open(service_dir / "test_server.py", "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def _write_validation_benchmark(self, config: MCPConfig, service_dir: Path):
+        """Scrive bench_validation.py: costo di validazione dell'input per ogni tool."""
+        service_name_clean = config.service_name.replace('-', '_')
+        schemas = self._tool_schemas(config)
+        tool_models = ""
+        samples = ""
+        for tool in self._tool_specs(config):
+            tool_name = _py_literal(self._tool_name(config, tool))
+            module = f"tools.{tool.name}" if config.layout == Layout.LAZY else f"{service_name_clean}_mcp"
+            tool_models += f"    {tool_name}: ({_py_literal(module)}, {_py_literal(self._model_name(config, tool))}),\n"
+            params_schema = schemas["tools"][tool.name]["input_schema"]["properties"]["params"]
+            sample = _schema_example(params_schema, schemas["definitions"])
+            if sample is MISSING:
+                sample = None  # Nessun campione valido: il benchmark salta il tool
+            samples += f"    {tool_name}: {sample!r},\n"
+        helpers_module = "_common" if config.layout == Layout.LAZY else f"{service_name_clean}_mcp"
+        if config.layout == Layout.LAZY:
+            # Come il server: i tool con modelli profondi sono importati con uno stack grande
+            module_import = f"from {service_name_clean}_mcp import import_tool_module"
+        else:
+            module_import = "from importlib import import_module as import_tool_module"
+
+        content = f'''#!/usr/bin/env python3
+"""
+Validation benchmark for {config.service_name.title()} MCP Server.
+
+Measures the cost of validating the input model of every tool, in microseconds per input:
+    dict     model_validate() on the decoded arguments (the MCP call path)
+    json     model_validate_json() straight from the raw JSON bytes
+    batch    validate_batch() over BATCH_SIZE inputs
+    trusted  an instance the server already validated, passed in again
+
+Run it from this directory:
+    python {BENCHMARK_FILE} [--tool NAME] [--number N]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Dict, Tuple
+from pydantic import ValidationError
+
+from {helpers_module} import validate_batch
+{module_import}
+
+BATCH_SIZE = 100
+COLUMNS = ("dict", "json", "batch", "trusted")
+
+# Tool name -> (module, input model)
+TOOL_MODELS: Dict[str, Tuple[str, str]] = {{
+{tool_models}}}
+
+# Valid sample input per tool, built from its JSON schema at generation time
+SAMPLES: Dict[str, Any] = {{
+{samples}}}
+
+
+def per_call(function: Callable[[], Any], number: int) -> float:
+    """Best of 5 runs, in microseconds per call."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def bench_tool(name: str, number: int) -> Dict[str, float]:
+    """Time every validation path of one tool."""
+    module, model_name = TOOL_MODELS[name]
+    model = getattr(import_tool_module(module), model_name)
+    sample = SAMPLES[name]
+    payload = json.dumps(sample).encode()
+    batch = [sample] * BATCH_SIZE
+    instance = model.model_validate(sample)
+    return {{
+        "dict": per_call(lambda: model.model_validate(sample), number),
+        "json": per_call(lambda: model.model_validate_json(payload), number),
+        "batch": per_call(lambda: validate_batch(model, batch), max(number // BATCH_SIZE, 1)) / BATCH_SIZE,
+        "trusted": per_call(lambda: model.model_validate(instance), number),
+    }}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure input validation cost per tool")
+    parser.add_argument("--tool", help="Only benchmark tools whose name contains this text")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    results = {{}}
+    for name in TOOL_MODELS:
+        if args.tool and args.tool not in name:
+            continue
+        try:
+            results[name] = bench_tool(name, args.number)
+        except ValidationError as e:
+            print(f"[SKIP] {{name}}: generated sample is not valid ({{e.error_count()}} errors)")
+
+    width = max([len(name) for name in results] + [4])
+    print(f"{{'tool':<{{width}}}}" + "".join(f"  {{column:>8}}" for column in COLUMNS) + "  (us per input)")
+    for name, timings in sorted(results.items(), key=lambda item: item[1]["dict"], reverse=True):
+        print(f"{{name:<{{width}}}}" + "".join(f"  {{timings[column]:>8.2f}}" for column in COLUMNS))
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+        with open(service_dir / BENCHMARK_FILE, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def _write_launcher(self, config: MCPConfig, service_dir: Path):
+        """Scrive serve.py: launcher di produzione multi-worker per HTTP/SSE."""
+        service_name_clean = config.service_name.replace('-', '_')
+        service_name_title = config.service_name.replace('-', ' ').title()
+        if config.transport == Transport.SSE:
+            # Le sessioni SSE vivono nel worker che tiene aperto lo stream: un worker per porta
+            app_factory = "mcp.sse_app()"
+            session_path = "mcp.settings.sse_path"
+            default_workers = "1"
+            middleware = '''class SessionLimitMiddleware:
+    """Reject new sessions with 503 once a worker serves max_sessions of them.
+
+    Every SSE session holds one open stream on the SSE path, so open streams are counted.
+    Busy workers answer immediately with Retry-After instead of queueing work
+    they cannot keep up with.
+    """
+
+    def __init__(self, app, max_sessions: int, path: str):
+        self.app = app
+        self.max_sessions = max_sessions
+        self.path = path.rstrip("/")
+        self.active = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") != self.path or self.max_sessions <= 0:
+            await self.app(scope, receive, send)
+            return
+        if self.active >= self.max_sessions:
+            await send_busy(send)
+            return
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+'''
+            serve = '''def serve(args: argparse.Namespace) -> None:
+    """Run one worker per port: SSE sessions are bound to the process holding the stream.
+
+    Put a load balancer with sticky sessions in front of ports port..port+workers-1.
+    """
+    if args.workers == 1:
+        run_worker(args, args.port)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(args, args.port + index), kwargs={"detach": True})
+        for index in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"[INFO] {len(workers)} SSE workers on ports {args.port}-{args.port + len(workers) - 1}", file=sys.stderr)
+
+    def shutdown(signum, frame):
+        # SIGTERM lets every worker drain its sessions within --graceful-timeout
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    for worker in workers:
+        worker.join()
+
+
+def run_worker(args: argparse.Namespace, port: int, detach: bool = False) -> None:
+    """Serve the app on one port in the current process."""
+    if detach and hasattr(os, "setpgrp"):
+        # Terminal signals go to the supervisor only, which forwards a single SIGTERM
+        os.setpgrp()
+    uvicorn.run(
+        "serve:create_app",
+        factory=True,
+        host=args.host,
+        port=port,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+    )
+'''
+        else:
+            app_factory = "mcp.streamable_http_app()"
+            session_path = "mcp.settings.streamable_http_path"
+            default_workers = "os.cpu_count() or 1"
+            middleware = '''class SessionLimitMiddleware:
+    """Reject new sessions with 503 once a worker serves max_sessions of them.
+
+    Stateful sessions are tracked by their mcp-session-id, from the response that
+    creates them until the client deletes them, the server no longer knows them, or
+    they stay idle (no request in flight) for idle_timeout seconds, like the SDK that
+    closes them; requests of open sessions are always served. In stateless mode a
+    request is a session of its own, so concurrent requests are counted.
+    Busy workers answer immediately with Retry-After instead of queueing work
+    they cannot keep up with.
+    """
+
+    def __init__(self, app, max_sessions: int, path: str, stateless: bool, idle_timeout: Optional[float]):
+        self.app = app
+        self.max_sessions = max_sessions
+        self.path = path.rstrip("/")
+        self.stateless = stateless
+        self.idle_timeout = idle_timeout
+        self.sessions: Dict[bytes, float] = {}  # Session id -> end of its last request
+        self.in_flight: Dict[bytes, int] = {}  # Session id -> requests being served
+        self.pending = 0  # Requests creating a session, not yet answered
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") != self.path or self.max_sessions <= 0:
+            await self.app(scope, receive, send)
+            return
+        session_id = None if self.stateless else dict(scope["headers"]).get(b"mcp-session-id")
+        if session_id is not None:
+            self.in_flight[session_id] = self.in_flight.get(session_id, 0) + 1
+            try:
+                await self.app(scope, receive, self._tracking(send, session_id, scope["method"]))
+            finally:
+                self.in_flight[session_id] -= 1
+                if not self.in_flight[session_id]:
+                    del self.in_flight[session_id]
+                if session_id in self.sessions:
+                    self.sessions[session_id] = time.monotonic()
+            return
+        if self._open_sessions() + self.pending >= self.max_sessions:
+            await send_busy(send)
+            return
+        self.pending += 1
+        try:
+            await self.app(scope, receive, self._tracking(send, None, scope["method"]))
+        finally:
+            self.pending -= 1
+
+    def _open_sessions(self) -> int:
+        """Count the tracked sessions, forgetting those idle for longer than idle_timeout."""
+        if self.idle_timeout is not None:
+            deadline = time.monotonic() - self.idle_timeout
+            for session_id, last_seen in list(self.sessions.items()):
+                if last_seen < deadline and session_id not in self.in_flight:
+                    del self.sessions[session_id]
+        return len(self.sessions)
+
+    def _tracking(self, send, session_id, method: str):
+        """Wrap send to record sessions created and closed by the response."""
+        async def tracking_send(message):
+            if message["type"] == "http.response.start" and not self.stateless:
+                status = message["status"]
+                created = dict(message.get("headers") or []).get(b"mcp-session-id")
+                if created is not None and status < 400:
+                    self.sessions[created] = time.monotonic()
+                if session_id is not None and (status == 404 or method == "DELETE" and status < 300):
+                    self.sessions.pop(session_id, None)
+            await send(message)
+        return tracking_send
+'''
+            serve = '''def serve(args: argparse.Namespace) -> None:
+    """Run the workers on a shared socket; uvicorn supervises and restarts them."""
+    uvicorn.run(
+        "serve:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+    )
+'''
+
+        http_settings = ""
+        limit_args = f"max_sessions, {session_path}"
+        if config.transport == Transport.HTTP:
+            http_settings = '''    if int(os.environ.get("MCP_WORKERS", DEFAULT_WORKERS)) > 1:
+        # Consecutive requests of a client may reach different workers
+        mcp.settings.stateless_http = True
+'''
+            limit_args += ", mcp.settings.stateless_http, idle_timeout"
+            http_settings += '''    # Sessions the SDK closes once idle stop counting too (None: they never expire)
+    idle_timeout = getattr(mcp.settings, "session_idle_timeout", DEFAULT_SESSION_IDLE_TIMEOUT)
+'''
+
+        content = f'''#!/usr/bin/env python3
+"""
+Production launcher for the {service_name_title} MCP server.
+
+Runs the {config.transport.value.upper()} app under uvicorn with multiple worker processes,
+a per-worker limit on concurrent sessions and graceful shutdown.
+
+Usage:
+    python serve.py --workers 4 --port 8000 --max-sessions 100
+
+Every option can also be set with the matching MCP_* environment variable.
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+DEFAULT_WORKERS = {default_workers}
+DEFAULT_MAX_SESSIONS = 100
+DEFAULT_GRACEFUL_TIMEOUT = 30
+DEFAULT_SESSION_IDLE_TIMEOUT = 1800  # SDK default, for releases that never close idle sessions
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+async def send_busy(send) -> None:
+    """Answer 503 with Retry-After: the worker is at its session limit."""
+    await send({{
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [(b"content-type", b"application/json"), (b"retry-after", b"1")],
+    }})
+    await send({{"type": "http.response.body", "body": b'{{"error": "Server busy, retry later"}}'}})
+
+
+{middleware}
+
+def create_app():
+    """Build the ASGI app of one worker (uvicorn calls this in every worker process)."""
+    from {service_name_clean}_mcp import mcp
+
+{http_settings}    if os.environ.get("MCP_HOST", "127.0.0.1") not in LOCAL_HOSTS and getattr(mcp.settings, "transport_security", None):
+        # Same rule FastMCP applies to its own host: localhost-only Host checks do not fit a public bind
+        mcp.settings.transport_security = None
+    max_sessions = int(os.environ.get("MCP_MAX_SESSIONS", DEFAULT_MAX_SESSIONS))
+    return SessionLimitMiddleware({app_factory}, {limit_args})
+
+
+{serve}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the {service_name_title} MCP server in production")
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "127.0.0.1"), help="Bind address")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", 8000)), help="Bind port")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MCP_WORKERS", DEFAULT_WORKERS)),
+                        help="Number of worker processes")
+    parser.add_argument("--max-sessions", type=int,
+                        default=int(os.environ.get("MCP_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+                        help="Open MCP sessions per worker before answering 503 to new ones (0: unlimited)")
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.environ.get("MCP_GRACEFUL_TIMEOUT", DEFAULT_GRACEFUL_TIMEOUT)),
+                        help="Seconds to drain open sessions on shutdown")
+    parser.add_argument("--log-level", default=os.environ.get("MCP_LOG_LEVEL", "info"), help="uvicorn log level")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # Worker processes read their settings from the environment
+    os.environ["MCP_HOST"] = args.host
+    os.environ["MCP_WORKERS"] = str(args.workers)
+    os.environ["MCP_MAX_SESSIONS"] = str(args.max_sessions)
+    serve(args)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+        with open(service_dir / LAUNCHER_FILE, "w", encoding="utf-8") as f:
+            f.write(content)
+
     def _write_python_requirements(self, config: MCPConfig, service_dir: Path):
         """Scrive requirements.txt per Python."""
-        content = '''mcp[cli]
+        content = f'''{MCP_REQUIREMENT}
 httpx>=0.28.0
 pydantic>=2.0.0
 python-dotenv>=1.0.0
 '''
+        if config.transport != Transport.STDIO:
+            content += "uvicorn>=0.31.1\n"
         
         with open(service_dir / "requirements.txt", "w") as f:
             f.write(content)
@@ -333,6 +2119,7 @@ python-dotenv>=1.0.0
         """Scrive pyproject.toml per packaging moderno Python."""
         service_name_clean = config.service_name.replace('-', '_')
         service_name_title = config.service_name.replace('-', ' ').title()
+        launcher_dependency = '    "uvicorn>=0.31.1",\n' if config.transport != Transport.STDIO else ""
         
         content = f'''[build-system]
 requires = ["setuptools>=61.0", "wheel"]
@@ -360,11 +2147,11 @@ classifiers = [
 ]
 
 dependencies = [
-    "mcp[cli]>=1.0.0",
+    "{MCP_REQUIREMENT}",
     "httpx>=0.28.0",
     "pydantic>=2.0.0",
     "python-dotenv>=1.0.0",
-]
+{launcher_dependency}]
 
 [project.optional-dependencies]
 dev = [
@@ -397,6 +2184,57 @@ target-version = "py310"
         """Scrive README.md completo e GitHub-ready."""
         service_name_clean = config.service_name.replace('-', '_')
         service_name_title = config.service_name.replace('-', ' ').title()
+        tools_section = ""
+        for tool in self._tool_specs(config):
+            parameters = ""
+            for tool_field in tool.fields:
+                default = "" if tool_field.required else f", default: {tool_field.default}"
+                parameters += f"- `{tool_field.alias or tool_field.name}` ({tool_field.annotation}{default}): {tool_field.description}\n"
+            tools_section += f"### {self._tool_name(config, tool)}\n\n{tool.summary.rstrip('.')}.\n\n"
+            if parameters:
+                tools_section += f"**Parameters:**\n{parameters}\n"
+
+        layout_files = ""
+        if config.layout == Layout.LAZY:
+            layout_files = (
+                "├── tool_registry.json               # Precomputed tool metadata and schemas\n"
+                "├── _common.py                       # Shared API helpers\n"
+            )
+            if self._model_modules(config):
+                layout_files += "├── _models/                         # One module per OpenAPI schema or $ref cycle\n"
+            layout_files += "├── tools/                           # One module per tool, imported on first call\n"
+
+        production_section = ""
+        if config.transport != Transport.STDIO:
+            layout_files += f"├── {LAUNCHER_FILE}                         # Multi-worker production launcher\n"
+            if config.transport == Transport.SSE:
+                scaling = (
+                    "SSE sessions are bound to the worker holding the stream, so each worker listens on "
+                    "its own port (`--port` to `--port + workers - 1`): put a load balancer with sticky "
+                    "sessions in front of them."
+                )
+            else:
+                scaling = (
+                    "Workers share one port. With more than one worker the server runs in stateless mode, "
+                    "so any worker can answer any request and each request counts as one session."
+                )
+            production_section = f'''### Run in Production
+
+```bash
+python {LAUNCHER_FILE} --host 0.0.0.0 --port 8000 --workers 4 --max-sessions 100
+```
+
+{scaling} Each worker keeps at most `--max-sessions` MCP sessions open (a session lasts from its `mcp-session-id` until the client deletes it, or for the lifetime of the SSE stream) and answers new ones with `503` and `Retry-After` beyond that; requests of open sessions are always served. On SIGTERM/Ctrl+C workers stop accepting connections and drain open sessions for up to `--graceful-timeout` seconds. Options can also be set with `MCP_HOST`, `MCP_PORT`, `MCP_WORKERS`, `MCP_MAX_SESSIONS`, `MCP_GRACEFUL_TIMEOUT` and `MCP_LOG_LEVEL`.
+
+'''
+        
+        hedging_section = ""
+        if config.hedge_percentile is not None:
+            hedging_section = f'''### Request Hedging
+
+API requests of tools annotated `idempotentHint: True` are hedged. When a request has not finished within the p{config.hedge_percentile:g} latency measured live for its endpoint, a duplicate is sent; the first response wins and the other request is cancelled. Hedging starts after `HEDGE_MIN_SAMPLES` requests per endpoint, and a global budget keeps duplicates below `HEDGE_BUDGET` (5%) of hedged calls. Tune the `HEDGE_*` constants next to `API_BASE_URL`.
+
+'''
         
         content = f'''# {service_name_title} MCP Server
 
@@ -467,7 +2305,17 @@ python {service_name_clean}_mcp.py
 python test_server.py
 ```
 
-### MCP Client Configuration
+### Measure Validation Cost
+
+```bash
+python {BENCHMARK_FILE} --number 2000
+```
+
+Prints the input validation cost of every tool in microseconds: from decoded arguments (`dict`), from raw JSON (`json`), per item with `validate_batch()` (`batch`) and for an input model instance the server already validated (`trusted`).
+
+Internal and batch callers can skip validation of data this server already validated by keeping the input model instance (for example in a cache) instead of a dict: input models use `revalidate_instances='never'`, so `mcp.call_tool(name, {{"params": instance}})` and `validate_batch()` return instances unchanged. The list validators used by `validate_batch()` are built when each input model is imported.
+
+{hedging_section}{production_section}### MCP Client Configuration
 
 Add to your MCP client configuration (e.g., Claude Desktop):
 
@@ -489,22 +2337,7 @@ Add to your MCP client configuration (e.g., Claude Desktop):
 
 ## Tools
 
-### {config.service_name}-list_resources
-
-List resources from {config.service_name}.
-
-**Parameters:**
-- `limit` (int, default: 20): Number of results
-- `offset` (int, default: 0): Skip results
-
-### {config.service_name}-get_resource
-
-Get a specific resource from {config.service_name}.
-
-**Parameters:**
-- `resource_id` (str): Resource identifier
-
-## Development
+{tools_section}## Development
 
 ### Setup Development Environment
 
@@ -530,7 +2363,8 @@ ruff check .
 ```
 {service_name_clean}_mcp/
 ├── {service_name_clean}_mcp.py      # Main server file
-├── test_server.py                   # Test suite
+{layout_files}├── test_server.py                   # Test suite
+├── {BENCHMARK_FILE}              # Validation cost per tool
 ├── requirements.txt                # Python dependencies
 ├── pyproject.toml                  # Modern Python packaging
 ├── README.md                        # This file
@@ -666,6 +2500,10 @@ SOFTWARE.
         from datetime import datetime
         date = datetime.now().strftime("%Y-%m-%d")
         service_name_title = config.service_name.replace('-', ' ').title()
+        if config.openapi is not None:
+            tools_summary = f"{len(self._tool_specs(config))} tools generated from OpenAPI spec {config.openapi.name}"
+        else:
+            tools_summary = "Basic tools: list_resources and get_resource"
         
         content = f'''# Changelog
 
@@ -679,7 +2517,7 @@ and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0
 ### Added
 - Initial project setup
 - {service_name_title} MCP Server implementation
-- Basic tools: list_resources and get_resource
+- {tools_summary}
 - FastMCP framework integration
 - Pydantic v2 input validation
 - Comprehensive error handling
@@ -700,17 +2538,17 @@ and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0
     
     def _write_evaluation(self, config: MCPConfig, service_dir: Path):
         """Scrive evaluation.xml."""
+        qa_pairs = ""
+        for tool in self._tool_specs(config)[:EVALUATION_TOOL_LIMIT]:
+            tool_name = self._tool_name(config, tool)
+            qa_pairs += f'''    <qa_pair>
+        <question>Use the {tool_name} tool to demonstrate its functionality</question>
+        <answer>Tool {tool_name} executed successfully</answer>
+    </qa_pair>
+'''
         content = f'''<?xml version="1.0" encoding="UTF-8"?>
 <evaluation>
-    <qa_pair>
-        <question>Use the {config.service_name}-list_resources tool to demonstrate its functionality</question>
-        <answer>Tool {config.service_name}-list_resources executed successfully</answer>
-    </qa_pair>
-    <qa_pair>
-        <question>Use the {config.service_name}-get_resource tool to retrieve a specific resource</question>
-        <answer>Tool {config.service_name}-get_resource executed successfully</answer>
-    </qa_pair>
-</evaluation>
+{qa_pairs}</evaluation>
 '''
         
         with open(service_dir / "evaluation.xml", "w", encoding="utf-8") as f:
@@ -729,6 +2567,11 @@ def main():
     parser.add_argument("--typescript", action="store_true", help="Generate TypeScript server")
     parser.add_argument("--transport", choices=["stdio", "sse", "http"], default="stdio", help="Transport type")
     parser.add_argument("--no-evaluation", action="store_true", help="Skip evaluation generation")
+    parser.add_argument("--layout", choices=["single", "lazy"], default="single",
+                        help="Server layout (lazy: static tool registry, handlers imported on first call)")
+    parser.add_argument("--openapi", type=Path, help="OpenAPI 3 spec (JSON or YAML): one tool per operation")
+    parser.add_argument("--hedge", type=float, metavar="PERCENTILE",
+                        help="Hedge API requests of idempotent tools slower than this live latency percentile (e.g. 95)")
     
     args = parser.parse_args()
     
@@ -736,6 +2579,14 @@ def main():
         print("Error: Specify either --python or --typescript")
         return
     
+    if args.openapi is not None and not args.openapi.is_file():
+        print(f"Error: OpenAPI spec not found: {args.openapi}")
+        return
+    
+    if args.hedge is not None and not 0 < args.hedge < 100:
+        print("Error: --hedge must be a percentile between 0 and 100")
+        return
+    
     language = Language.PYTHON if args.python else Language.TYPESCRIPT
     transport = Transport(args.transport)
     
@@ -743,11 +2594,23 @@ def main():
         service_name=args.service,
         language=language,
         transport=transport,
-        generate_evaluation=not args.no_evaluation
+        generate_evaluation=not args.no_evaluation,
+        layout=Layout(args.layout),
+        openapi=args.openapi,
+        hedge_percentile=args.hedge
     )
     
     builder = MCPBuilder()
-    builder.generate_server(config)
+    try:
+        builder.generate_server(config)
+    except ModuleNotFoundError as e:
+        if e.name != "yaml":
+            raise
+        print("Error: PyYAML is required for YAML specs: pip install pyyaml")
+        return
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
     
     print(f"[SUCCESS] MCP server generated successfully!")
     print(f"[INFO] Next steps:")